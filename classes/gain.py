@@ -1,44 +1,118 @@
+from functools import lru_cache
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.optimize import curve_fit
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from scipy.optimize import least_squares
+
+
+def _log_gain(sqrt_P, P_th):
+    # log(1 / (1 - c)**2) == -2 * log1p(-c) with c = sqrt(P / P_th), accurate as P approaches P_th.
+    # Takes sqrt(P) so the fit can compute it once; shared by the fit and Gain.fit_function
+    return -2.0 * np.log1p(-sqrt_P / np.sqrt(P_th))
+
+
+def _gain_function(P, P_th):
+    # 1 / (1 - sqrt(P / P_th))**2 evaluated in place in a single buffer
+    out = np.empty_like(P, dtype=float)
+    np.divide(P, P_th, out=out)
+    np.sqrt(out, out=out)
+    np.subtract(1, out, out=out)
+    below = out > 0
+    np.square(out, out=out)
+    np.reciprocal(out, out=out, where=below)
+    # The gain diverges at and above threshold
+    out[~below] = np.inf
+    return out
+
+
+def _fit_residuals(params, sqrt_P, log_G):
+    return _log_gain(sqrt_P, params[0]) - log_G
+
+
+def _fit_jacobian(params, sqrt_P, log_G):
+    # d/dP_th of _log_gain, as an (N, 1) Jacobian for least_squares
+    P_th = params[0]
+    c = sqrt_P / np.sqrt(P_th)
+    return (-c / (P_th * (1 - c))).reshape(-1, 1)
+
+
+def _closed_form_pth(P, log_G):
+    # Inverting the model per point: sqrt(P/P_th) = 1 - exp(-log_G/2), only valid where G > 1
+    valid = log_G > 0
+    if not np.any(valid):
+        return 40.0
+    return np.median(P[valid] / np.expm1(-log_G[valid] / 2)**2)
+
+
+def _fit_pth(P, log_G, p0=None):
+    # The model is only real for P_th > max(P), so the search is bounded there
+    lower = P.max() * 1.001
+    if p0 is None:
+        p0 = _closed_form_pth(P, log_G)
+    # The start point must lie strictly inside the bounds
+    p0 = max(p0, lower * 1.1)
+    result = least_squares(_fit_residuals, x0=[p0], args=(np.sqrt(P), log_G), jac=_fit_jacobian, method='trf',
+                           bounds=([lower], [np.inf]), ftol=1e-6, xtol=1e-6, gtol=1e-6)
+    return result.x[0]
+
+
+@lru_cache(maxsize=32)
+def _fit_curve(P_th, n, chebyshev=False):
+    # Sampled fit curve, memoized on P_th so replotting or toggling the scale reuses it
+    if chebyshev:
+        # Chebyshev nodes cluster the samples near P_th, where the gain diverges
+        k = np.arange(n)
+        P = P_th * 0.5 * (1 - np.cos(np.pi * k / (n - 1)))
+    else:
+        P = np.linspace(0, P_th, n)
+    V = _gain_function(P, P_th)
+    # The cached arrays are shared between callers
+    P.flags.writeable = False
+    V.flags.writeable = False
+    return P, V
+
 
 class Gain:
     def __init__(self, pump_power, V, V0, y_axis = [0,50]):
         self.P = np.array(pump_power)
         self.V = np.array(V)
         self.V0 = np.array(V0)
-        self.G = self.V / self.V0
-        self.log_G = np.log(self.G)
         self.y_axis = y_axis
 
+        # Validate before taking the log so bad input never reaches the fit
         if len(self.V) != len(self.V0) or len(self.V) != len(self.P):
-            raise KeyError("Pump power, α², and α₀² should have the same number of points")
-        else:
-            # Fit the curve and plot the results
-            self.fit_Pth()
+            raise ValueError("Pump power, α², and α₀² should have the same number of points")
+        if np.any(self.V <= 0) or np.any(self.V0 <= 0):
+            raise ValueError("α² and α₀² should be positive")
+
+        self.G = self.V / self.V0
+        self.log_G = np.log(self.G)
+
+        # Fit the curve and plot the results
+        self.fit_Pth()
 
 
     def gain_function(self, P, P_th):
-        return 1 / (1 - (P / P_th)**.5) ** 2
+        return _gain_function(P, P_th)
     
 
     def fit_function(self, P, P_th):
-        return np.log(1 / (1 - (P / P_th)**.5) ** 2)
-    
+        return _log_gain(np.sqrt(P), P_th)
 
-    def fit_Pth(self, initial_guess=40):
-        # Fit the threshold power P_th
-        params, _ = curve_fit(self.fit_function, self.P, self.log_G, p0=[initial_guess])
-        self.P_th_fitted = params[0]
+
+    def fit_Pth(self, initial_guess=None):
+        # Fit the threshold power P_th, seeded by the closed-form estimate unless a guess is given
+        self.P_th_fitted = _fit_pth(self.P, self.log_G, initial_guess)
     
 
 
 
     def plot_fit(self):
-        self.P_fit = np.linspace(0, self.P_th_fitted, 500)
-        self.V_fit = self.gain_function(self.P_fit, self.P_th_fitted)
+        self.P_fit, self.V_fit = _fit_curve(self.P_th_fitted, 500)
 
-        fig, ax = plt.subplots()
+        fig = Figure()
+        FigureCanvasAgg(fig)
+        ax = fig.subplots()
         ax.plot(self.P, self.G, 'or', label="Gain Data")
         ax.plot(self.P_fit, self.V_fit, 'r-', label="Gain Fit")
 
@@ -51,10 +125,11 @@ class Gain:
         return fig
     
     def plot_fit_log(self):
-        self.P_fit = np.linspace(0, self.P_th_fitted, 5000)
-        self.V_fit = self.gain_function(self.P_fit, self.P_th_fitted)
+        self.P_fit, self.V_fit = _fit_curve(self.P_th_fitted, 200, chebyshev=True)
 
-        fig, ax = plt.subplots()
+        fig = Figure()
+        FigureCanvasAgg(fig)
+        ax = fig.subplots()
         ax.semilogy(self.P, self.G, 'or', label="Gain Data")
         ax.semilogy(self.P_fit, self.V_fit, 'r-', label="Gain Fit")
 
@@ -68,3 +143,28 @@ class Gain:
 
         ax.legend()
         return fig
+    
+    def plot_fit_interactive(self, log_scale=False):
+        # Plotly version of plot_fit / plot_fit_log, rendered client-side by the browser
+        import plotly.graph_objects as go  # deferred, only the interactive plot needs Plotly
+
+        if log_scale:
+            self.P_fit, self.V_fit = _fit_curve(self.P_th_fitted, 200, chebyshev=True)
+        else:
+            self.P_fit, self.V_fit = _fit_curve(self.P_th_fitted, 500)
+
+        fig = go.Figure(data=[
+            go.Scatter(x=self.P, y=self.G, mode='markers', marker_color='red', name="Gain Data"),
+            go.Scatter(x=self.P_fit, y=self.V_fit, mode='lines', line_color='red', name="Gain Fit"),
+        ])
+        fig.update_xaxes(title_text="Power [mW]", range=[0, self.P_th_fitted])
+        y_axis = np.array(self.y_axis, dtype=float)
+        if log_scale:
+            # A log axis cannot start at or below zero; fall back to the smallest measured gain
+            if y_axis[0] <= 0:
+                y_axis[0] = self.G.min()
+            # Plotly expects log-axis ranges in decades
+            fig.update_yaxes(title_text="Gain", type='log', range=np.log10(y_axis).tolist())
+        else:
+            fig.update_yaxes(title_text="Gain", range=y_axis.tolist())
+        return fig
@@ -1,9 +1,15 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from typing import Union, List
-from scipy.optimize import curve_fit
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from scipy.optimize import least_squares
 
 class SqEfficiency:
+    # Scalar inputs checked by _validate_scalars: (attribute, name, min_value, max_value)
+    _SCALAR_SPEC = (
+        ('omega', 'Detection Frequency', 0, None),
+        ('gamma', 'Decay Rate Cavity', 0, None),
+    )
+
     def __init__(self, 
                  power: np.ndarray, 
                  sq_data: np.ndarray, 
@@ -12,7 +18,9 @@ class SqEfficiency:
                  detection_frequency: float = 5, 
                  decay_rate_cavity: float = 20.3,
                  y_axis = np.array([-3,15]),
-                 P_th = ""
+                 P_th = "",
+                 n_starts: int = 1,
+                 seed: int = 0
                                             ):
         """
         Initializes the SqEfficiency object with input data for power, squeezing, and antisqueezing values.
@@ -24,49 +32,37 @@ class SqEfficiency:
             phase_noise (bool): Flag to indicate if phase noise should be considered in fitting.
             detection_frequency (float): Detection frequency (MHz).
             decay_rate_cavity (float): Decay rate of the cavity (MHz).
+            n_starts (int): Number of initial guesses explored in parallel when fitting.
+            seed (int): Seed of the sampled initial guesses, so multi-start fits are reproducible.
         """
-        self.power = self._validate_input(power, np.ndarray, 'Power')
-        self.sq_data = self._validate_input(sq_data, np.ndarray, 'Squeezing Data')
-        self.asq_data = self._validate_input(asq_data, np.ndarray, 'Antisqueezing Data')
+        self.power = np.asarray(power, dtype=np.float64)
+        self.sq_data = np.asarray(sq_data, dtype=np.float64)
+        self.asq_data = np.asarray(asq_data, dtype=np.float64)
         self.phase_noise = self._validate_boolean(phase_noise, 'Phase Noise')
-        self.omega = self._validate_float(detection_frequency, 'Detection Frequency', min_value=0)
-        self.gamma = self._validate_float(decay_rate_cavity, 'Decay Rate Cavity', min_value=0)
+        self.omega = detection_frequency
+        self.gamma = decay_rate_cavity
+        self._validate_scalars()
         self.y_axis = y_axis
         if P_th:
            self.P_th = float(P_th)
         else: 
             self.P_th = P_th
 
+        # Invariants reused on every fit iteration
+        self._r2 = (self.omega / self.gamma)**2
+        self._N = len(self.power)
+        self._residual_buf = np.empty(2 * self._N)
+        self._jac_buf = np.empty((2 * self._N, 3 if self.phase_noise else 2))
+
         if (self.phase_noise and len(self.sq_data) + len(self.asq_data) < 3):
-            raise KeyError(f"It is required at least 2 squeezing and antisqueezing data") 
+            raise ValueError(f"It is required at least 2 squeezing and antisqueezing data") 
         elif  len(self.sq_data) != len(self.asq_data) or len(self.sq_data) != len(self.power):
-            raise KeyError(f"You should have the same number of points in squeezing data, antisqueezing data and pump power") 
+            raise ValueError(f"You should have the same number of points in squeezing data, antisqueezing data and pump power") 
         elif (not self.phase_noise and len(self.sq_data) + len(self.asq_data) < 1):
-            raise KeyError(f"It is required at least 1 squeezing and antisqueezing data") 
+            raise ValueError(f"It is required at least 1 squeezing and antisqueezing data") 
         else:
             # Fit the curve and plot the results
-            self.fit_curve_noise()
-
-    def _validate_input(self, data: Union[np.ndarray, List], expected_type: type, name: str) -> np.ndarray:
-        """
-        Validate that input data is of the expected type and has the correct shape.
-
-        Args:
-            data (Union[np.ndarray, List]): The input data to be validated.
-            expected_type (type): The expected type of the input data.
-            name (str): Name of the data being validated, used for error messages.
-
-        Returns:
-            np.ndarray: The validated input data.
-        """
-        if not isinstance(data, expected_type):
-            raise ValueError(f"{name} must be of type {expected_type}.")
-        
-        # Ensure data is a numpy array for consistency
-        if isinstance(data, list):
-            data = np.array(data)
-        
-        return data
+            self.fit_curve_noise(n_starts, seed)
 
     def _validate_boolean(self, value: bool, name: str) -> bool:
         """
@@ -83,34 +79,32 @@ class SqEfficiency:
             raise ValueError(f"{name} must be of type bool.")
         return value
 
-    def _validate_float(self, value: float, name: str, min_value: float = None, max_value: float = None) -> float:
+    def _validate_scalars(self):
         """
-        Validate that the value is a float and within the specified range.
-
-        Args:
-            value (float): The value to validate.
-            name (str): The name used for error reporting.
-            min_value (float, optional): Minimum allowed value for the parameter.
-            max_value (float, optional): Maximum allowed value for the parameter.
-
-        Returns:
-            float: The validated float value.
+        Validate the scalar inputs listed in _SCALAR_SPEC in a single pass, converting them to float.
         """
-        if not isinstance(value, (float, int)):
-            raise ValueError(f"{name} must be of type float.")
-        value = float(value)  # Convert to float if it's an integer
-        
-        if min_value is not None and value < min_value:
-            raise ValueError(f"{name} must be greater than or equal to {min_value}.")
-        if max_value is not None and value > max_value:
-            raise ValueError(f"{name} must be less than or equal to {max_value}.")
-        
-        return value
+        for attr, name, min_value, max_value in self._SCALAR_SPEC:
+            value = getattr(self, attr)
+            if not isinstance(value, (float, int)):
+                raise ValueError(f"{name} must be of type float.")
+            value = float(value)  # Convert to float if it's an integer
+            if min_value is not None and value < min_value:
+                raise ValueError(f"{name} must be greater than or equal to {min_value}.")
+            if max_value is not None and value > max_value:
+                raise ValueError(f"{name} must be less than or equal to {max_value}.")
+            setattr(self, attr, value)
 
-    def fit_curve_noise(self):
+    def fit_curve_noise(self, n_starts: int = 1, seed: int = 0):
         """
         Fits the model to the squeezing and antisqueezing data using curve fitting.
 
+        With n_starts > 1, the default initial guess is complemented by Latin Hypercube
+        samples of the parameter bounds, fitted in parallel, and the lowest-cost fit is kept.
+
+        Args:
+            n_starts (int): Number of initial guesses to fit from.
+            seed (int): Seed of the Latin Hypercube samples.
+
         Updates the fitted parameters: eta, P_th, and phase_noise.
         """
         if not self.P_th:
@@ -121,26 +115,68 @@ class SqEfficiency:
             param_bounds = ([0, self.P_th - 1e-3, 0], [1, self.P_th + 1e-3, np.pi / 4]) if self.phase_noise else ([0, self.P_th - 1e-3], [1, self.P_th + 1e-3])
         
         # Fit model to both sq and asq data
-        result = curve_fit(
-            lambda p, eta, P_th, phase_noise=None: self.combined_residuals_noise((eta, P_th, phase_noise), p)
-            if self.phase_noise else self.combined_residuals_noise_no_phase((eta, P_th), p),
-            self.power,
-            np.zeros(2 * len(self.power)),
-            p0=initial_guess,
-            bounds=param_bounds
+        residuals = self.combined_residuals_noise if self.phase_noise else self.combined_residuals_noise_no_phase
+        fit_options = dict(
+            bounds=param_bounds,
+            args=(self.power,),
+            jac=self._jac_noise,
+            method='trf',
+            x_scale='jac',
+            ftol=1e-6,
+            xtol=1e-6,
+            gtol=1e-6
         )
+        if n_starts > 1:
+            # Only multi-start fits need joblib, which is an optional dependency
+            try:
+                from joblib import Parallel, delayed
+            except ImportError:
+                raise ImportError("Fitting with n_starts > 1 requires joblib (pip install joblib)") from None
+            starts = self._sample_starts(initial_guess, param_bounds, n_starts, seed)
+            results = Parallel(n_jobs=-1, backend='loky')(
+                delayed(least_squares)(residuals, x0=x0, **fit_options) for x0 in starts
+            )
+            result = min(results, key=lambda r: r.cost)
+        else:
+            result = least_squares(residuals, x0=initial_guess, **fit_options)
 
         # Extract fitted parameters
         if self.phase_noise:
-            self.eta_fit, self.P_th_fit, self.phase_noise_fit = result[0]
+            self.eta_fit, self.P_th_fit, self.phase_noise_fit = result.x
         else:
-            self.eta_fit, self.P_th_fit = result[0]
+            self.eta_fit, self.P_th_fit = result.x
             self.phase_noise_fit = 0  # Set phase noise to 0 if not fitting it
 
         # Generate fitted curves for plotting
-        self.power_fit = np.linspace(0, self.P_th_fit, 1000)
+        # Chebyshev nodes cluster the samples near 0 and P_th, where the curves bend sharply
+        k = np.arange(200)
+        self.power_fit = self.P_th_fit * 0.5 * (1 - np.cos(np.pi * k / (len(k) - 1)))
         self.sq_fit, self.asq_fit = self.sq_asq_model_noise(self.power_fit, self.eta_fit, self.P_th_fit, self.phase_noise_fit)
 
+    def _sample_starts(self, initial_guess: list, param_bounds: tuple, n_starts: int, seed: int = 0) -> np.ndarray:
+        """
+        Builds the initial guesses for a multi-start fit.
+
+        Args:
+            initial_guess (list): Default initial guess, always used as the first start.
+            param_bounds (tuple): Lower and upper bounds of the fitted parameters.
+            n_starts (int): Total number of initial guesses.
+            seed (int): Seed of the Latin Hypercube sampler.
+
+        Returns:
+            np.ndarray: Initial guesses of shape (n_starts, number of parameters).
+        """
+        from scipy.stats import qmc
+
+        lo = np.array(param_bounds[0], dtype=float)
+        hi = np.array(param_bounds[1], dtype=float)
+        if np.isinf(hi[1]):
+            # Sample the threshold above the highest pump power so the model stays finite
+            lo[1] = max(lo[1], self.power.max())
+            hi[1] = max(2 * initial_guess[1], 2 * self.power.max())
+
+        samples = qmc.LatinHypercube(d=len(lo), seed=seed).random(n_starts - 1) * (hi - lo) + lo
+        return np.vstack((initial_guess, samples))
     
 
     def sq_asq_model_noise(self, power: np.ndarray, eta: float, P_th: float, phase_noise: float) -> tuple:
@@ -157,17 +193,23 @@ class SqEfficiency:
             tuple: Squeezing and antisqueezing values (dB).
         """
         c = np.sqrt(power / P_th)
-        sq = 1 - eta * (4 * c) / ((1 + c)**2 + (self.omega / self.gamma)**2)
-        asq = 1 + eta * (4 * c) / ((1 - c)**2 + (self.omega / self.gamma)**2)
+        sq = 1 - eta * (4 * c) / ((1 + c)**2 + self._r2)
+        asq = 1 + eta * (4 * c) / ((1 - c)**2 + self._r2)
 
+        # Stack both branches so a single log10 call converts them to dB
+        stacked = np.empty((2,) + np.shape(c))
         if self.phase_noise:
-            sq, asq = 10 * np.log10(sq * np.cos(phase_noise)**2 + asq * np.sin(phase_noise)**2), \
-                      10 * np.log10(asq * np.cos(phase_noise)**2 + sq * np.sin(phase_noise)**2)
+            cp = np.cos(phase_noise)**2
+            sp = np.sin(phase_noise)**2
+            stacked[0] = sq * cp + asq * sp
+            stacked[1] = asq * cp + sq * sp
         else:
-            sq = 10 * np.log10(sq)
-            asq = 10 * np.log10(asq)
+            stacked[0] = sq
+            stacked[1] = asq
 
-        return sq, asq
+        res = np.log10(stacked)
+        res *= 10
+        return res[0], res[1]
 
     def combined_residuals_noise(self, params: tuple, power: np.ndarray) -> np.ndarray:
         """
@@ -182,8 +224,9 @@ class SqEfficiency:
         """
         eta, P_th, phase_noise = params
         sq, asq = self.sq_asq_model_noise(power, eta, P_th, phase_noise)
-        residuals = np.concatenate((sq - self.sq_data, asq - self.asq_data))
-        return residuals
+        np.subtract(sq, self.sq_data, out=self._residual_buf[:self._N])
+        np.subtract(asq, self.asq_data, out=self._residual_buf[self._N:])
+        return self._residual_buf
 
     def combined_residuals_noise_no_phase(self, params: tuple, power: np.ndarray) -> np.ndarray:
         """
@@ -198,12 +241,68 @@ class SqEfficiency:
         """
         eta, P_th = params
         sq, asq = self.sq_asq_model_noise(power, eta, P_th, 0)  # No phase noise
-        residuals = np.concatenate((sq - self.sq_data, asq - self.asq_data))
-        return residuals
+        np.subtract(sq, self.sq_data, out=self._residual_buf[:self._N])
+        np.subtract(asq, self.asq_data, out=self._residual_buf[self._N:])
+        return self._residual_buf
+
+    def _jac_noise(self, params: tuple, power: np.ndarray) -> np.ndarray:
+        """
+        Analytic Jacobian of the combined residuals with respect to the fitted parameters.
+
+        Args:
+            params (tuple): Parameters (eta, P_th[, phase_noise]) being fitted.
+            power (np.ndarray): Array of power values.
+
+        Returns:
+            np.ndarray: Jacobian of shape (2N, 3) with phase noise, (2N, 2) otherwise.
+        """
+        eta, P_th = params[0], params[1]
+        phase_noise = params[2] if self.phase_noise else 0
+        c = np.sqrt(power / P_th)
+        A = 4 * c
+        D_sq = (1 + c)**2 + self._r2
+        D_asq = (1 - c)**2 + self._r2
+        dc_dPth = -c / (2 * P_th)
+
+        # Linear squeezing/antisqueezing and their partial derivatives
+        sq = 1 - eta * A / D_sq
+        asq = 1 + eta * A / D_asq
+        dsq_deta = -A / D_sq
+        dasq_deta = A / D_asq
+        dsq_dPth = -4 * eta * (D_sq - 2 * c * (1 + c)) / D_sq**2 * dc_dPth
+        dasq_dPth = 4 * eta * (D_asq + 2 * c * (1 - c)) / D_asq**2 * dc_dPth
+
+        # Fill the sq (top) and asq (bottom) halves of the preallocated Jacobian in place
+        J_sq = self._jac_buf[:self._N]
+        J_asq = self._jac_buf[self._N:]
+        if self.phase_noise:
+            cp = np.cos(phase_noise)**2
+            sp = np.sin(phase_noise)**2
+            s2 = np.sin(2 * phase_noise)
+            J_sq[:, 0] = dsq_deta * cp + dasq_deta * sp
+            J_sq[:, 1] = dsq_dPth * cp + dasq_dPth * sp
+            J_sq[:, 2] = (asq - sq) * s2
+            J_asq[:, 0] = dasq_deta * cp + dsq_deta * sp
+            J_asq[:, 1] = dasq_dPth * cp + dsq_dPth * sp
+            J_asq[:, 2] = (sq - asq) * s2
+            sq, asq = sq * cp + asq * sp, asq * cp + sq * sp
+        else:
+            J_sq[:, 0] = dsq_deta
+            J_sq[:, 1] = dsq_dPth
+            J_asq[:, 0] = dasq_deta
+            J_asq[:, 1] = dasq_dPth
+
+        # Chain rule through 10 * log10(x)
+        scale = 10 / np.log(10)
+        J_sq *= (scale / sq)[:, None]
+        J_asq *= (scale / asq)[:, None]
+        return self._jac_buf
     
 
     def plot_noise(self):
-        fig, ax = plt.subplots()
+        fig = Figure()
+        FigureCanvasAgg(fig)
+        ax = fig.subplots()
         ax.plot(self.power, self.sq_data, 'or', label="Squeezing Data")
         ax.plot(self.power, self.asq_data, 'ob', label="Antisqueezing Data")
         ax.plot(self.power_fit, self.sq_fit, 'r-', label="Squeezing Fit")
@@ -1,10 +1,4 @@
 import streamlit as st
-from tabs.squeezing_page import squeezing_efficiency_analysis
-from tabs.intracavity_page import intracavity
-from tabs.gain_page import GainFit
-from tabs.visibility_page import visibility
-from tabs.clearance_page import clearence
-from tabs.cavity_interaction_page import cavity_interaction
 
 st.set_page_config(page_title="Lab App", page_icon=":chart_with_upwards_trend:")
 
@@ -19,17 +13,24 @@ menu = [
 
 choice = st.sidebar.selectbox("Select a Page:", menu)
 
+# Pages are imported on demand so the simple calculators never load SciPy or Matplotlib
 if choice == "Squeezing Efficiency":
+    from tabs.squeezing_page import squeezing_efficiency_analysis
     squeezing_efficiency_analysis()
 elif choice == "Intra-Cavity Loss":
+    from tabs.intracavity_page import intracavity
     intracavity()
 elif choice == "Gain":
+    from tabs.gain_page import GainFit
     GainFit()
 elif choice == "Visibility":
+    from tabs.visibility_page import visibility
     visibility()
 elif choice == "Clearence":
+    from tabs.clearance_page import clearence
     clearence()
 elif choice == "Cavity Interaction":
+    from tabs.cavity_interaction_page import cavity_interaction
     cavity_interaction()
 
 
@@ -1,5 +1,10 @@
 import streamlit as st
+import matplotlib.pyplot as plt
 from classes.cavity_interaction import CavityInteraction
+from tabs.utils import use_stix_fonts
+
+
+use_stix_fonts()
 
 
 def cavity_interaction():
@@ -29,4 +34,5 @@ def cavity_interaction():
 
     fig = analysis.plot()
 
-    st.pyplot(fig)
\ No newline at end of file
+    st.pyplot(fig)
+    plt.close(fig)
@@ -1,6 +1,14 @@
 import numpy as np
 import streamlit as st
 
+
+def _varx2(VAR, CL):
+    # Shared powers of ten computed once
+    a = 10**(-CL / 10)
+    b = 10**(VAR / 10)
+    return 10 * (np.log10(b - a) - np.log10(1 - a))
+
+
 def clearence():
     st.title("Clearence")
 
@@ -13,17 +21,18 @@ def clearence():
     
     
     
-    VAR_X1 = st.text_input(r"Variance without removing clearence $VAR(X_1)\, [\text{{dB}}]$ ", "-5")
-    
-    Clearence = st.text_input(r"Clearence of your signal $CL$ $\, [\text{{dB}}]$", "15")
-    
-    
+    with st.form("clearance_form"):
+        VAR_X1 = st.text_input(r"Variance without removing clearence $VAR(X_1)\, [\text{{dB}}]$ ", "-5")
+        Clearence = st.text_input(r"Clearence of your signal $CL$ $\, [\text{{dB}}]$", "15")
+        submitted = st.form_submit_button("Compute")
+
+    # Only parse and compute once the form is submitted, not on every keystroke
+    if not submitted:
+        return
+
     VAR_X1 = float(VAR_X1)
     Clearence = float(Clearence)
-   
-    
 
-    
     # Error checks
     valid_input = True
 
@@ -32,6 +41,6 @@ def clearence():
         valid_input = False
 
     if valid_input:
-        varx2 = -10*np.log10(1-10**(-Clearence / 10))+10*np.log10(10**(VAR_X1 / 10) - 10**(-Clearence/10))
+        varx2 = _varx2(VAR_X1, Clearence)
 
         st.latex(rf"\text{{Var}}(X_2) = {varx2:.2f}\, \text{{dB}}")
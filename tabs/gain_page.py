@@ -1,12 +1,17 @@
-from classes.gain import Gain
+from tabs.utils import parse_csv, render_png, use_stix_fonts
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-import io
 
 
-plt.rcParams['mathtext.fontset'] = 'stix'
-plt.rcParams['font.family'] = 'STIXGeneral'
+use_stix_fonts()
+
+
+@st.cache_data(show_spinner=False)
+def _fit_gain(P_t, V_t, V0_t):
+    # Tuples keep the cache key hashable; identical inputs reuse the previous fit.
+    # y_axis is left out of the key since it does not affect the fit
+    from classes.gain import Gain  # deferred, SciPy is only loaded once a fit is requested
+    return Gain(pump_power = np.array(P_t), V = np.array(V_t), V0 = np.array(V0_t))
 
 
 def GainFit():
@@ -24,45 +29,48 @@ def GainFit():
     
 
     st.latex(r"\ln\Big(\frac{\alpha}{\alpha_0} \Big)^2 = 2 \cdot \ln\Bigg(\frac{1}{1 - \sqrt{P/P_{th}}} \Bigg)")
+
+    _gain_body()
+
+
+@st.fragment
+def _gain_body():
+    # Inputs, fit and plot rerun on their own; the static equations above are not redrawn
     st.sidebar.header("Input Parameters")
     P = st.sidebar.text_input("Pump Power [mW] (comma-separated)", "6, 10")
-    P = np.array([float(x) for x in P.split(",")])
-
     V = st.sidebar.text_input(r"$\alpha^2$ (comma-separated)", "2, 4")
-    V = np.array([float(x) for x in V.split(",")])
-
     V0 = st.sidebar.text_input(r"$\alpha_0^2$ (comma-separated)", "1, 1")
-    V0 = np.array([float(x) for x in V0.split(",")])
-
     y_axis = st.sidebar.text_input("y-axis limits (comma-separated)", "1,30")
-    y_axis = np.array([float(x) for x in y_axis.split(",")])
 
     log_scale = st.sidebar.checkbox("Log Scale?", value=False)
 
     # Run the analysis
     if st.sidebar.button("Analyze"):
         try:
-            analysis = Gain(pump_power = P, V = V, V0 = V0, y_axis=y_axis)
+            # Parsing errors are reported with st.error below
+            P = parse_csv(P, "Pump Power")
+            V = parse_csv(V, "α²")
+            V0 = parse_csv(V0, "α₀²")
+            y_axis = parse_csv(y_axis, "y-axis limits")
 
-            if not log_scale:
-                fig = analysis.plot_fit()
-            else:
-                fig = analysis.plot_fit_log()
+            fit_key = (tuple(P.tolist()), tuple(V.tolist()), tuple(V0.tolist()))
+            analysis = _fit_gain(*fit_key)
+            analysis.y_axis = y_axis
+            fig_key = fit_key + (tuple(y_axis.tolist()), log_scale)
 
-            # Display the plot
-            st.pyplot(fig)
+            # Display the interactive plot; Matplotlib is only used for the PNG download
+            st.plotly_chart(analysis.plot_fit_interactive(log_scale))
             st.latex(rf"P_{{th}} = {analysis.P_th_fitted:.2f}\text{{ mW}}")
                         
             # Add save/download button
             st.write("Click below to download the figure:")
-            buf = io.BytesIO()  # Create an in-memory buffer
-            fig.savefig(buf, format="png", dpi=500)  # Save the figure into the buffer
-            buf.seek(0)  # Rewind the buffer to the beginning
             st.download_button(
                 label="Download Figure",
-                data=buf,
+                # Built and encoded only when the button is clicked, not on every Analyze.
+                # This runs after the click, outside this try, so a failed render fails the download silently
+                data=lambda: render_png(analysis.plot_fit_log() if log_scale else analysis.plot_fit(), fig_key, dpi=500),
                 file_name="gain_plot.png",
                 mime="image/png"
             )
         except Exception as e:
-            st.error(f"Error: {e}")
\ No newline at end of file
+            st.error(f"Error: {e}")
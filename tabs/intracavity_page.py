@@ -1,5 +1,5 @@
+import math
 import streamlit as st
-import numpy as np
 
 
 
@@ -15,13 +15,20 @@ def intracavity():
     st.latex(r"\mathcal{L}_1 = T \cdot \frac{1 - \frac{P_{\text{refl}}-(1-m)P_{\text{in}}}{mP_{\text{in}}}}{\Bigg(1+\sqrt{\frac{P_{\text{refl}} - (1-m)P_{\text{in}}}{mP_{\text{in}}}\cdot(1-T)}\Bigg)^2}")
     st.latex(r"\mathcal{L}_2 = T \cdot \frac{1 - \sqrt{\frac{P_{\text{refl}} - (1-m)P_{\text{in}}}{mP_{\text{in}}}}}{1 + \sqrt{\frac{P_{\text{refl}} - (1-m)P_{\text{in}}}{mP_{\text{in}}}}}")
     
-    T = st.text_input(r"Cavity transmission mirror $T$ [0-1]", "0.055")
+    with st.form("intracavity_form"):
+        T = st.text_input(r"Cavity transmission mirror $T$ [0-1]", "0.055")
+        P_refl = st.text_input(r"Reflected Power at resonance $P_{refl}$", "1.02")
+        P_in = st.text_input(r"Reflected Power at resonance $P_{in}$", "1.07")
+        m = st.text_input(r"Mode matching $m$ [0-1]", "0.98")
+        submitted = st.form_submit_button("Compute")
+
+    # Only parse and compute once the form is submitted, not on every keystroke
+    if not submitted:
+        return
+
     T = float(T)
-    P_refl = st.text_input(r"Reflected Power at resonance $P_{refl}$", "1.02")
     P_refl = float(P_refl)
-    P_in = st.text_input(r"Reflected Power at resonance $P_{in}$", "1.07")
     P_in = float(P_in)
-    m = st.text_input(r"Mode matching $m$ [0-1]", "0.98")
     m = float(m)
 
     # Error checks
@@ -36,21 +43,17 @@ def intracavity():
     if not (P_in >= P_refl):
         st.error("Reflected power out of resonance ($P_{in}$) must be greater than reflected power at resonance ($P_{refl}$).")
         valid_input = False
+    if not (P_refl >= (1 - m) * P_in):
+        st.error("Reflected power at resonance ($P_{refl}$) must be at least the non-mode-matched power $(1-m)P_{in}$.")
+        valid_input = False
     
     if valid_input:
 
-        numerator_inside = P_refl - (1 - m) * P_in
-        denominator_inside = m * P_in
-        intermediate_fraction = numerator_inside / denominator_inside
-
-        # Calculate the final formula
-        L1 = T * (1 - intermediate_fraction) / ((1 + np.sqrt(intermediate_fraction * (1 - T))) ** 2)
-
-        intermediate_step = np.sqrt((P_refl - (1-m)*P_in)/(m* P_in))
-
-        L2 = T * (1 - intermediate_step)/(1 + intermediate_step)
-
-
+        frac = (P_refl - (1 - m) * P_in) / (m * P_in)
+        s = math.sqrt(frac)
+        one_mT = 1.0 - T
+        L2 = T * (1 - s) / (1 + s)
+        L1 = T * (1 - frac) / (1 + s * math.sqrt(one_mT))**2
 
         st.latex(rf"\text{{Intra-cavity loss: }} \mathcal{{L}}_1 = {L1 * 100:.2f}\%")
         st.latex(rf"\text{{Intra-cavity loss: }} \mathcal{{L}}_2 = {L2 * 100:.2f}\%")
@@ -1,12 +1,18 @@
-from classes.sqefficiency import SqEfficiency
-import io
+from tabs.utils import parse_csv, render_png, use_stix_fonts
 import numpy as np
 import streamlit as st
-import matplotlib.pyplot as plt
 
 
-plt.rcParams['mathtext.fontset'] = 'stix'
-plt.rcParams['font.family'] = 'STIXGeneral'
+use_stix_fonts()
+
+
+@st.cache_data(show_spinner=False)
+def _fit_sq(power_t, sq_t, asq_t, phase_noise, detection_frequency, decay_rate_cavity, y_axis_t, P_th):
+    # Tuples keep the cache key hashable; identical inputs reuse the previous fit
+    from classes.sqefficiency import SqEfficiency  # deferred, SciPy is only loaded once a fit is requested
+    return SqEfficiency(np.array(power_t), np.array(sq_t), np.array(asq_t), phase_noise=phase_noise, detection_frequency=detection_frequency, decay_rate_cavity=decay_rate_cavity, y_axis=np.array(y_axis_t), P_th = P_th)
+
+
 # Define the app's main pages
 def squeezing_efficiency_analysis():
     st.title("Squeezing Efficiency Analysis")
@@ -23,7 +29,12 @@ def squeezing_efficiency_analysis():
     st.latex(r"VAR(SQ) = 10 \cdot \log_{10}\Big(SQ \cdot \cos(\varepsilon)^2 + ASQ \cdot \sin(\varepsilon)^2\Big)")
     st.latex(r"VAR(ASQ) = 10 \cdot \log_{10}\Big(ASQ \cdot \cos(\varepsilon)^2 + SQ \cdot \sin(\varepsilon)^2\Big)")
 
-    # Inputs
+    _squeezing_body()
+
+
+@st.fragment
+def _squeezing_body():
+    # Inputs, fit and plot rerun on their own; the static equations above are not redrawn
     st.sidebar.header("Input Parameters")
     power = st.sidebar.text_input("Pump Power [mW] (comma-separated)", "6,10")
     sq_data = st.sidebar.text_input("Squeezing Data [dB] (comma-separated)", "-1.5,-2")
@@ -36,35 +47,34 @@ def squeezing_efficiency_analysis():
 
     y_axis = st.sidebar.text_input("y-axis limits (comma-separated)", "-3,15")
 
-    # Convert inputs
-    power = np.array([float(x) for x in power.split(",")])
-    sq_data = np.array([float(x) for x in sq_data.split(",")])
-    asq_data = np.array([float(x) for x in asq_data.split(",")])
-    detection_frequency = float(detection_frequency)
-    decay_rate_cavity = float(decay_rate_cavity)
-    y_axis = np.array([float(x) for x in y_axis.split(",")])
-
     # Run the analysis
     if st.sidebar.button("Analyze"):
         try:
+            # Convert inputs; parsing errors are reported with st.error below
+            power = parse_csv(power, "Pump Power")
+            sq_data = parse_csv(sq_data, "Squeezing Data")
+            asq_data = parse_csv(asq_data, "Antisqueezing Data")
+            detection_frequency = float(detection_frequency)
+            decay_rate_cavity = float(decay_rate_cavity)
+            y_axis = parse_csv(y_axis, "y-axis limits")
+
             # Perform analysis
-            analysis = SqEfficiency(power, sq_data, asq_data, phase_noise=phase_noise, detection_frequency=detection_frequency, decay_rate_cavity=decay_rate_cavity, y_axis=y_axis, P_th = P_th)
-            fig = analysis.plot_noise()
+            fig_key = (tuple(power.tolist()), tuple(sq_data.tolist()), tuple(asq_data.tolist()), phase_noise, detection_frequency, decay_rate_cavity, tuple(y_axis.tolist()), P_th)
+            fig = _fit_sq(*fig_key).plot_noise()
 
             # Display the plot
             st.pyplot(fig)
 
             # Add save/download button
             st.write("Click below to download the figure:")
-            buf = io.BytesIO()  # Create an in-memory buffer
-            fig.savefig(buf, format="png", dpi=500)  # Save the figure into the buffer
-            buf.seek(0)  # Rewind the buffer to the beginning
             st.download_button(
                 label="Download Figure",
-                data=buf,
+                # Encoded only when the button is clicked, not on every Analyze.
+                # This runs after the click, outside this try, so a failed render fails the download silently
+                data=lambda: render_png(fig, fig_key, dpi=500),
                 file_name="squeezing_efficiency_plot.png",
                 mime="image/png"
             )
 
         except Exception as e:
-            st.error(f"Error: {e}")
\ No newline at end of file
+            st.error(f"Error: {e}")
@@ -0,0 +1,43 @@
+import io
+import numpy as np
+import streamlit as st
+
+
+def use_stix_fonts():
+    """
+    Set the STIX fonts used by every Matplotlib figure in the app.
+
+    Called by the plotting pages on import, so the calculator pages never load Matplotlib.
+    """
+    import matplotlib
+
+    matplotlib.rcParams['mathtext.fontset'] = 'stix'
+    matplotlib.rcParams['font.family'] = 'STIXGeneral'
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def render_png(_fig, fig_key, dpi=500):
+    """
+    Render a Matplotlib figure to PNG bytes.
+
+    The figure itself is not hashed (leading underscore); fig_key identifies it, so the same
+    plot is only encoded once per resolution. Only the bytes are cached, never the figure.
+    """
+    buf = io.BytesIO()
+    _fig.savefig(buf, format="png", dpi=dpi, bbox_inches="tight")
+    return buf.getvalue()
+
+
+@st.cache_data(show_spinner=False)
+def parse_csv(s, name):
+    """
+    Parse a comma-separated string of numbers into a float array, memoized on the raw string.
+    """
+    try:
+        # NumPy >= 2.3 raises on unparsable entries; older versions silently truncated
+        arr = np.fromstring(s.strip(), sep=",")
+    except ValueError:
+        raise ValueError(f"{name} must be comma-separated numbers")
+    if arr.size == 0:
+        raise ValueError(f"{name} is empty")
+    return arr
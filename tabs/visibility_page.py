@@ -1,7 +1,12 @@
+import math
 import streamlit as st
-import numpy as np
 
 
+def _visibility(I_1, I_2, I_max, I_min):
+    beta = I_1 / I_2
+    sb = math.sqrt(beta)
+    return (1 + beta)/(2 * sb) * (I_max - I_min)/(I_max + I_min)
+
 
 def visibility():
     st.title("Visibility")
@@ -17,23 +22,24 @@ def visibility():
     st.latex(r"\mathcal{V} = \frac{1 + \beta}{2\sqrt{\beta}}\cdot \frac{I_{max}-I_{min}}{I_{max}+I_{min}}")
     
 
-    I_1 = st.text_input(r"Intesity of the first field $I_1$", "0.5")
-    
-    I_2 = st.text_input(r"Intesity of the second field $I_2$", "0.5")
-    
-    I_max = st.text_input(r"Intesity of the maximum interference $I_{max}$", "0.8")
-    
-    I_min = st.text_input(r"Intesity of the minimum interference $I_{min}$", "0.01")
-    
-    I_0 = st.text_input(r"Floor level $I_0$", "0.0")
+    with st.form("visibility_form"):
+        I_1 = st.text_input(r"Intesity of the first field $I_1$", "0.5")
+        I_2 = st.text_input(r"Intesity of the second field $I_2$", "0.5")
+        I_max = st.text_input(r"Intesity of the maximum interference $I_{max}$", "0.8")
+        I_min = st.text_input(r"Intesity of the minimum interference $I_{min}$", "0.01")
+        I_0 = st.text_input(r"Floor level $I_0$", "0.0")
+        submitted = st.form_submit_button("Compute")
+
+    # Only parse and compute once the form is submitted, not on every keystroke
+    if not submitted:
+        return
+
     I_0 = float(I_0)
     I_min = float(I_min) - I_0
     I_max = float(I_max) - I_0
     I_2 = float(I_2) -I_0
     I_1 = float(I_1) - I_0
-    beta = I_1 / I_2
 
-    
     # Error checks
     valid_input = True
 
@@ -47,7 +53,7 @@ def visibility():
     
     if valid_input:
 
-        v = (1 + beta)/(2 * beta**.5) * (I_max - I_min)/(I_max + I_min)
+        v = _visibility(I_1, I_2, I_max, I_min)
         st.latex(rf"\text{{Visibility: }} \mathcal{{V}} = {v * 100:.2f}\%")
 
 